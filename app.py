@@ -13,14 +13,27 @@ import threading
 import time
 import uuid
 import json
+import hashlib
+import sqlite3
 import xml.etree.ElementTree as ET
 import subprocess
 import unicodedata
+import multiprocessing
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from datetime import datetime
 
 import fitz
 
 from flask import Flask, request, jsonify, Response
+from requests.adapters import HTTPAdapter
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -39,8 +52,10 @@ from difflib import SequenceMatcher
 import pandas as pd
 import nltk
 from nltk.corpus import stopwords
-from gensim.models import LdaModel, CoherenceModel
-from gensim.corpora import Dictionary
+from gensim import matutils
+from gensim.models import LdaModel, LdaMulticore
+from gensim.models.coherencemodel import COHERENCE_MEASURES, SLIDING_WINDOW_SIZES
+from gensim.corpora import Dictionary, MmCorpus
 from wordcloud import WordCloud
 from urllib.parse import quote, urljoin
 import pyLDAvis
@@ -52,6 +67,12 @@ import matplotlib
 import matplotlib.pyplot as plt
 import math
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
 matplotlib.use("Agg")
 
 # ---------------------------
@@ -68,6 +89,7 @@ start_time = datetime.now()
 # Globales Dictionary
 download_progress = {}
 analysis_progress = {}
+analysis_progress_lock = threading.Lock()
 sediment_progress = {}
 
 # Base folder for downloads (data acquisition)
@@ -85,6 +107,11 @@ ANALYSIS_ROOT = os.path.join(os.getcwd(), "analysis")
 if not os.path.exists(ANALYSIS_ROOT):
     os.makedirs(ANALYSIS_ROOT)
 
+# Base folder for caches (LLM responses, extracted texts)
+CACHE_ROOT = os.path.join(os.getcwd(), "cache")
+if not os.path.exists(CACHE_ROOT):
+    os.makedirs(CACHE_ROOT)
+
 # ---------------------------
 # Process exclusivity
 # ---------------------------
@@ -99,6 +126,113 @@ GECKO_DRIVER_PATH = (
 )
 PDF_BASE_URL = "https://files.eric.ed.gov/fulltext/"
 
+# LLM backend: "http" talks to the Ollama REST API over a pooled keep-alive
+# session, "cli" starts a new `ollama run` process for every request.
+LLM_BACKEND = "http"
+OLLAMA_MODEL = "llama3.1p"
+OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_API_ENDPOINT = "generate"  # "generate" or "chat"
+OLLAMA_KEEP_ALIVE = "30m"
+# Number of LLM requests in flight across all papers; should not exceed the
+# OLLAMA_NUM_PARALLEL setting of the Ollama server.
+LLM_MAX_WORKERS = 4
+# Papers analysed concurrently. They share the LLM_MAX_WORKERS request slots,
+# so extra papers keep the backend busy without overloading it.
+PAPER_CONCURRENCY = 2
+OLLAMA_POOL_SIZE = LLM_MAX_WORKERS
+LLM_TIMEOUT = 180
+MODELFILE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "modelfile[P].txt"
+)
+
+# Chunks are budgeted in estimated tokens: the context window (num_ctx from the
+# modelfile, LLM_DEFAULT_CONTEXT_TOKENS if it is not set) minus the prompt
+# header and CHUNK_RESPONSE_TOKENS reserved for the answer. Trailing sentences
+# worth up to CHUNK_OVERLAP_TOKENS are repeated at the start of the next chunk.
+LLM_DEFAULT_CONTEXT_TOKENS = 2048
+CHUNK_RESPONSE_TOKENS = 1024
+CHUNK_OVERLAP_TOKENS = 0
+# Characters per extra token in long words for the token estimate
+TOKEN_CHARS_PER_PIECE = 6
+
+# Chunk selection before the LLM stage: "full" sends every chunk (full scan for
+# recall-sensitive runs), "bm25" ranks the chunks of each paper against the
+# question keywords and only sends the RETRIEVAL_TOP_K best chunks per question.
+RETRIEVAL_MODE = "full"
+RETRIEVAL_TOP_K = 3
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# On-disk LLM response cache (SQLite, LRU eviction). Entries are keyed by
+# model name, modelfile directives and the full prompt.
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = os.path.join(CACHE_ROOT, "llm_responses.sqlite3")
+LLM_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# When the limit is exceeded, entries are evicted down to this fraction of it,
+# reading the oldest ones in batches of LLM_CACHE_EVICT_BATCH.
+LLM_CACHE_LOW_WATER = 0.9
+LLM_CACHE_EVICT_BATCH = 256
+
+# Cache of cleaned PDF text, keyed by the PDF content hash and the clean_text
+# options. Entries hold the text and each page's start offset in it. Bump
+# TEXT_CACHE_VERSION when extraction or cleaning changes.
+TEXT_CACHE_ENABLED = True
+TEXT_CACHE_ROOT = os.path.join(CACHE_ROOT, "text")
+TEXT_CACHE_VERSION = 3
+
+# Worker processes that extract and clean PDFs ahead of the LLM stage
+# (0 = extract inline) and how many papers may be prepared in advance.
+PDF_EXTRACT_WORKERS = 2
+PDF_PREFETCH = 2
+
+# Files in the analysis output folder that allow an interrupted run to be
+# continued via /resume_analysis: the run parameters and a journal with one
+# line per written section (result file offset) and per finished paper.
+RUN_PARAMS_FILENAME = "run_params.json"
+CHECKPOINT_FILENAME = "checkpoints.jsonl"
+QUESTIONS_FILENAME = "questions.txt"
+# Completed papers of an output folder, keyed by PDF content hash. Results are
+# reused by later runs with the same questions and settings.
+MANIFEST_FILENAME = "manifest.json"
+RESULT_FILE_PREFIX = "analysis_result_"
+# Incremental mode reuses the latest output folder of the same PDF directory
+# and questions instead of starting a new dated folder, so only PDFs that are
+# new or changed since the last run are analysed.
+INCREMENTAL_ANALYSIS = False
+# Answers of the sediment analysis are written once as Parquet, partitioned by
+# question id (requires pyarrow), and the LDA stage reads only the answer column
+# of its question. Without pyarrow, or with "csv", one CSV file per question is
+# written instead.
+ANSWER_STORE_FORMAT = "parquet"
+ANSWER_STORE_DIRNAME = "answers"
+# Worker processes that train the candidate topic counts of the topic search in
+# parallel, by default all cores but one (0 or 1 = serial search in the Flask
+# process)
+TOPIC_SEARCH_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+# Topic-count search: "exhaustive" trains every count of the range, "coarse"
+# trains every TOPIC_SEARCH_COARSE_STEP-th count until coherence has not improved
+# for TOPIC_SEARCH_PATIENCE coarse counts and then the counts around the best
+# one. The evaluated counts and their c_v scores are written to
+# TOPIC_SEARCH_REPORT_FILENAME in the question folder.
+TOPIC_SEARCH_STRATEGY = "coarse"
+TOPIC_SEARCH_COARSE_STEP = 3
+TOPIC_SEARCH_PATIENCE = 2
+TOPIC_SEARCH_REPORT_FILENAME = "topic_search.json"
+# LDA trainer: "single" is gensim's single-core LdaModel (default, comparable
+# with earlier results), "multicore" is LdaMulticore with LDA_WORKERS processes
+# for the E-step. LdaMulticore has no alpha="auto", "symmetric" is used instead.
+# With "multicore" the topic search runs its candidates one after another.
+LDA_BACKEND = "single"
+LDA_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+# Tokens, Dictionary and bag-of-words corpus of a question's answers are built
+# once and shared by the topic search, the final model, the coherence scores and
+# pyLDAvis. They are also saved with gensim's serialisation, keyed by a hash of
+# the answers, so a repeated sediment analysis of the same results skips the
+# preprocessing. Bump LDA_CORPUS_CACHE_VERSION when tokenisation changes.
+LDA_CORPUS_CACHE_ENABLED = True
+LDA_CORPUS_CACHE_ROOT = os.path.join(CACHE_ROOT, "lda")
+LDA_CORPUS_CACHE_VERSION = 1
+
 # ---------------------------
 # Functions: Data acquisition
 # ---------------------------
@@ -877,72 +1011,450 @@ def extract_keywords(question, min_len=4):
     sw = set(german_stopwords) if 'german_stopwords' in globals() else set()
     return {w for w in words if w not in sw and len(w) >= min_len}
 
-def extract_text_from_pdf(pdf_path, abort_data=None):
+def chunk_may_answer(chunk_low, kw_sets, expected_count):
+    if not kw_sets or len(kw_sets) < expected_count:
+        return True
+    return any(
+        not kws or any(k in chunk_low for k in kws)
+        for kws in kw_sets[:expected_count]
+    )
+
+# Ranks the chunks of one paper with BM25 against each question's keywords and
+# returns the indices of the top_k chunks per question. None means every chunk
+# is evaluated (no keywords to rank by, or not more chunks than top_k).
+def bm25_select_chunks(chunks_low, kw_sets, expected_count, top_k=RETRIEVAL_TOP_K):
+    if not kw_sets or len(kw_sets) < expected_count or not all(kw_sets[:expected_count]):
+        return None
+    n = len(chunks_low)
+    if n <= top_k:
+        return None
+
+    doc_len = [len(c.split()) or 1 for c in chunks_low]
+    avg_len = sum(doc_len) / n
+    tf = {k: [c.count(k) for c in chunks_low] for k in set().union(*kw_sets[:expected_count])}
+    idf = {}
+    for k, counts in tf.items():
+        df = sum(1 for x in counts if x)
+        idf[k] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    selected = set()
+    for kws in kw_sets[:expected_count]:
+        scores = []
+        for i in range(n):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len[i] / avg_len)
+            score = sum(
+                idf[k] * tf[k][i] * (BM25_K1 + 1) / (tf[k][i] + norm)
+                for k in kws
+                if tf[k][i]
+            )
+            if score > 0:
+                scores.append((score, i))
+        scores.sort(reverse=True)
+        selected.update(i for _, i in scores[:top_k])
+    return selected
+
+def iter_document_pages(doc, pdf_path, abort_data=None):
+    for page_num in range(doc.page_count):
+        if abort_data and abort_data.get("abort"):
+            logging.info("[ABORT] PDF parsing aborted")
+            break
+        try:
+            page_text = doc.load_page(page_num).get_text()
+        except Exception as inner_e:
+            logging.warning(
+                f"[EXTRACT] Error reading page {page_num} in {pdf_path}: {inner_e}"
+            )
+            continue
+        yield page_num, page_text
+
+def extract_pages_from_pdf(pdf_path, abort_data=None):
     try:
         doc = fitz.open(pdf_path)
     except Exception as e:
         logging.error(f"[EXTRACT] Could not open PDF: {pdf_path} – {e}")
-        return "", 0
+        return [], 0
 
-    text = ""
     try:
         page_count = doc.page_count
-        for page_num in range(page_count):
-            if abort_data and abort_data.get("abort"):
-                logging.info("[ABORT] PDF parsing aborted")
-                break
-            try:
-                page = doc.load_page(page_num)
-                text += page.get_text()
-            except Exception as inner_e:
-                logging.warning(
-                    f"[EXTRACT] Error reading page {page_num} in {pdf_path}: {inner_e}"
-                )
-                continue
+        pages = list(iter_document_pages(doc, pdf_path, abort_data=abort_data))
     finally:
         try:
             doc.close()
         except Exception:
             pass
 
-    return text, page_count
+    return pages, page_count
+
+def extract_text_from_pdf(pdf_path, abort_data=None):
+    pages, page_count = extract_pages_from_pdf(pdf_path, abort_data=abort_data)
+    return "".join(page_text for _, page_text in pages), page_count
+
+CLEAN_HYPHEN_NEWLINE_RE = re.compile(r"(\w+)-\n(\w+)")
+CLEAN_HYPHEN_SPACE_RE = re.compile(r"(\w)[-–]\s+(\w)")
+CLEAN_PAGE_HEADER_RE = re.compile(r"(?i)\n\s*Page\s+\d+\s*\n")
+CLEAN_PAGE_NUMBER_RE = re.compile(r"\n\s*\d+\s*\n")
+CLEAN_WHITESPACE_RE = re.compile(r"\s+")
+# Collapses whitespace and drops list numbers ("1. ") directly after it in one scan
+CLEAN_WHITESPACE_LIST_RE = re.compile(r"(?:\s+|^)(?:\d+\.\s+(?=\S))*")
+# A word hyphenated across a page break: "...educa-" + "tion ..."
+CLEAN_PAGE_END_HYPHEN_RE = re.compile(r"\w[-–]$")
+CLEAN_PAGE_START_WORD_RE = re.compile(r"\w")
 
 def clean_text(
     text,
     remove_list_numbers: bool = True,
     remove_page_headers: bool = True
 ):
-    text = unicodedata.normalize("NFKC", text)
-    text = text.replace("\u00ad", "")
-    text = re.sub(r"(\w+)-\n(\w+)", r"\1\2", text)
-    text = re.sub(r"(\w)[\--–]\s+(\w)", r"\1\2", text)
-    if remove_page_headers:
-        text = re.sub(r"(?i)\n\s*Page\s+\d+\s*\n", "\n", text)
-        text = re.sub(r"\n\s*\d+\s*\n", "\n", text)
-    text = re.sub(r"\n+", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    if not unicodedata.is_normalized("NFKC", text):
+        text = unicodedata.normalize("NFKC", text)
+    if "\u00ad" in text:
+        text = text.replace("\u00ad", "")
+    if "-\n" in text:
+        text = CLEAN_HYPHEN_NEWLINE_RE.sub(r"\1\2", text)
+    if "-" in text or "–" in text:
+        text = CLEAN_HYPHEN_SPACE_RE.sub(r"\1\2", text)
+    if remove_page_headers and "\n" in text:
+        text = CLEAN_PAGE_HEADER_RE.sub("\n", text)
+        text = CLEAN_PAGE_NUMBER_RE.sub("\n", text)
     if remove_list_numbers:
-        text = re.sub(r"(?<=\s|^)\d+\.\s+", "", text)
+        text = CLEAN_WHITESPACE_LIST_RE.sub(" ", text).strip()
+    else:
+        text = CLEAN_WHITESPACE_RE.sub(" ", text).strip()
 
     return text
 
-def query_llm_via_cli(input_text):
+# Cleans a document page by page and joins the pages with a space; a word
+# hyphenated across a page break is joined as it would be within a page.
+# page_starts holds [page_number, offset] of each page's first character in
+# the cleaned text (page numbers start at 1).
+def clean_pages(
+    pages,
+    remove_list_numbers: bool = True,
+    remove_page_headers: bool = True
+):
+    parts = []
+    page_starts = []
+    length = 0
+    for page_num, page_text in pages:
+        cleaned = clean_text(
+            f"\n{page_text}\n",
+            remove_list_numbers=remove_list_numbers,
+            remove_page_headers=remove_page_headers,
+        )
+        if not cleaned:
+            continue
+        if parts:
+            if CLEAN_PAGE_END_HYPHEN_RE.search(parts[-1]) and CLEAN_PAGE_START_WORD_RE.match(cleaned):
+                parts[-1] = parts[-1][:-1]
+                length -= 1
+            else:
+                parts.append(" ")
+                length += 1
+        page_starts.append([page_num + 1, length])
+        parts.append(cleaned)
+        length += len(cleaned)
+    return "".join(parts), page_starts
+
+def file_sha256(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def load_cleaned_text(
+    pdf_path,
+    abort_data=None,
+    remove_list_numbers: bool = True,
+    remove_page_headers: bool = True
+):
+    cache_path = None
+    if TEXT_CACHE_ENABLED:
+        try:
+            content_hash = file_sha256(pdf_path)
+        except OSError as e:
+            logging.warning(f"[TEXT_CACHE] Could not hash {pdf_path}: {e}")
+            content_hash = None
+        if content_hash:
+            options = f"remove_list_numbers={remove_list_numbers},remove_page_headers={remove_page_headers}"
+            key = hashlib.sha256(
+                f"{TEXT_CACHE_VERSION}|{content_hash}|{options}".encode("utf-8")
+            ).hexdigest()
+            cache_path = os.path.join(TEXT_CACHE_ROOT, key[:2], f"{key}.json")
+            if os.path.exists(cache_path):
+                logging.info(f"[TEXT_CACHE] Cached text used for {os.path.basename(pdf_path)}")
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    cached = json.load(f)
+                return cached["text"], cached["page_starts"]
+
+    pages, _ = extract_pages_from_pdf(pdf_path, abort_data=abort_data)
+    cleaned, page_starts = clean_pages(
+        pages,
+        remove_list_numbers=remove_list_numbers,
+        remove_page_headers=remove_page_headers,
+    )
+
+    if cache_path and cleaned and not (abort_data and abort_data.get("abort")):
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"text": cleaned, "page_starts": page_starts}, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logging.warning(f"[TEXT_CACHE] Could not write cache file: {e}")
+    return cleaned, page_starts
+
+def prefetch_cleaned_texts(pdf_paths, abort_data=None):
+    if PDF_EXTRACT_WORKERS <= 0:
+        for pdf_path in pdf_paths:
+            future = Future()
+            try:
+                future.set_result(load_cleaned_text(pdf_path, abort_data=abort_data))
+            except Exception as e:
+                future.set_exception(e)
+            yield pdf_path, future
+        return
+
+    executor = ProcessPoolExecutor(
+        max_workers=PDF_EXTRACT_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    remaining = iter(pdf_paths)
+    pending = deque()
+    try:
+        for pdf_path in remaining:
+            pending.append((pdf_path, executor.submit(load_cleaned_text, pdf_path)))
+            if len(pending) >= PDF_PREFETCH:
+                break
+        while pending:
+            pdf_path, future = pending.popleft()
+            next_path = next(remaining, None)
+            if next_path is not None:
+                pending.append((next_path, executor.submit(load_cleaned_text, next_path)))
+            yield pdf_path, future
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def read_modelfile_directives(path):
+    directives = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = " ".join(line.split())
+                if line and not line.startswith("#"):
+                    directives.append(line)
+    except OSError:
+        logging.warning(f"[LLM_CACHE] Modelfile not found: {path}")
+    return directives
+
+MODELFILE_DIRECTIVES = read_modelfile_directives(MODELFILE_PATH)
+
+def modelfile_parameter(name, default=None):
+    value = default
+    for directive in MODELFILE_DIRECTIVES:
+        parts = directive.split(" ", 2)
+        if len(parts) == 3 and parts[0].upper() == "PARAMETER" and parts[1] == name:
+            value = parts[2]
+    return value
+
+def modelfile_context_tokens():
+    value = modelfile_parameter("num_ctx", LLM_DEFAULT_CONTEXT_TOKENS)
     try:
-        process = subprocess.Popen(
-            ["ollama", "run", "llama3.1p"],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            encoding="utf-8",
-            errors="ignore",
-            bufsize=1,
+        return int(value)
+    except (TypeError, ValueError):
+        logging.warning(f"[CHUNK] Modelfile num_ctx is not a number: {value}")
+        return LLM_DEFAULT_CONTEXT_TOKENS
+
+LLM_CONTEXT_TOKENS = modelfile_context_tokens()
+
+llm_cache_lock = threading.Lock()
+llm_cache_conn = None
+llm_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "entries": 0, "bytes": 0}
+
+def get_llm_cache():
+    global llm_cache_conn
+    if llm_cache_conn is None:
+        conn = sqlite3.connect(LLM_CACHE_PATH, timeout=30, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)"
         )
-        stdout, stderr = process.communicate(input=f"{input_text}\n", timeout=180)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+        )
+        conn.commit()
+        entries, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        llm_cache_stats.update(entries=entries, bytes=size)
+        llm_cache_conn = conn
+    return llm_cache_conn
+
+def llm_cache_key(model, prompt):
+    h = hashlib.sha256()
+    for part in [model, *MODELFILE_DIRECTIVES, prompt]:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def llm_cache_get(key):
+    if not LLM_CACHE_ENABLED:
+        return None
+    with llm_cache_lock:
+        try:
+            conn = get_llm_cache()
+            row = conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                llm_cache_stats["misses"] += 1
+                return None
+            conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            conn.commit()
+            llm_cache_stats["hits"] += 1
+            return row[0]
+        except sqlite3.Error as e:
+            logging.warning(f"[LLM_CACHE] Lookup failed: {e}")
+            return None
+
+def llm_cache_put(key, response):
+    if not LLM_CACHE_ENABLED or not response:
+        return
+    size = len(response.encode("utf-8"))
+    # A response larger than the eviction target would evict the whole cache and itself
+    if size > LLM_CACHE_MAX_BYTES * LLM_CACHE_LOW_WATER:
+        return
+    with llm_cache_lock:
+        try:
+            conn = get_llm_cache()
+            old = conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, response, size, time.time()),
+            )
+            if old:
+                llm_cache_stats["bytes"] += size - old[0]
+            else:
+                llm_cache_stats["entries"] += 1
+                llm_cache_stats["bytes"] += size
+
+            if llm_cache_stats["bytes"] > LLM_CACHE_MAX_BYTES:
+                evicted = 0
+                target = LLM_CACHE_MAX_BYTES * LLM_CACHE_LOW_WATER
+                while llm_cache_stats["bytes"] > target:
+                    rows = conn.execute(
+                        "SELECT key, size FROM responses ORDER BY last_used LIMIT ?",
+                        (LLM_CACHE_EVICT_BATCH,),
+                    ).fetchall()
+                    if not rows:
+                        break
+                    for old_key, old_size in rows:
+                        if llm_cache_stats["bytes"] <= target:
+                            break
+                        conn.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                        llm_cache_stats["bytes"] -= old_size
+                        llm_cache_stats["entries"] -= 1
+                        evicted += 1
+                llm_cache_stats["evictions"] += evicted
+                logging.info(f"[LLM_CACHE] {evicted} entries evicted (size limit reached)")
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"[LLM_CACHE] Could not store response: {e}")
+
+def llm_cache_snapshot():
+    with llm_cache_lock:
+        stats = dict(llm_cache_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    return stats
+
+# Request slots shared by all papers of an analysis. They are only taken around
+# the backend call after a cache miss.
+llm_slots = threading.BoundedSemaphore(LLM_MAX_WORKERS)
+
+ollama_session = requests.Session()
+ollama_session.mount(
+    OLLAMA_BASE_URL,
+    HTTPAdapter(pool_connections=1, pool_maxsize=OLLAMA_POOL_SIZE),
+)
+
+def query_ollama_api(input_text, model=OLLAMA_MODEL):
+    if OLLAMA_API_ENDPOINT == "chat":
+        url = f"{OLLAMA_BASE_URL}/api/chat"
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": input_text}],
+            "stream": False,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "options": {"num_ctx": LLM_CONTEXT_TOKENS},
+        }
+    else:
+        url = f"{OLLAMA_BASE_URL}/api/generate"
+        payload = {
+            "model": model,
+            "prompt": input_text,
+            "stream": False,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "options": {"num_ctx": LLM_CONTEXT_TOKENS},
+        }
+    try:
+        r = ollama_session.post(url, json=payload, timeout=(10, LLM_TIMEOUT))
+        r.raise_for_status()
+        data = r.json()
+    except requests.exceptions.Timeout:
+        logging.error(f"LLM request timed out after {LLM_TIMEOUT} seconds")
+        return None
+    except Exception as e:
+        logging.error(f"LLM error: {e}")
+        return None
+
+    if OLLAMA_API_ENDPOINT == "chat":
+        response = data.get("message", {}).get("content", "")
+    else:
+        response = data.get("response", "")
+    return response.strip()
+
+def query_llm_via_cli(input_text):
+    cache_key = llm_cache_key(OLLAMA_MODEL, input_text)
+    cached = llm_cache_get(cache_key)
+    if cached is not None:
+        logging.info("[LLM_CACHE] Cache hit, model request skipped")
+        return cached
+
+    if LLM_BACKEND == "http":
+        with llm_slots:
+            response = query_ollama_api(input_text)
+        if response is None:
+            return ""
+        logging.info(f"Raw LLM response: {response}")
+        llm_cache_put(cache_key, response)
+        return response
+
+    try:
+        with llm_slots:
+            process = subprocess.Popen(
+                ["ollama", "run", OLLAMA_MODEL],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                errors="ignore",
+                bufsize=1,
+            )
+            stdout, stderr = process.communicate(input=f"{input_text}\n", timeout=LLM_TIMEOUT)
         if process.returncode != 0:
             logging.error(f"LLM error: {stderr.strip()}")
             return ""
         response = re.sub(r"\x1b\[.*?m", "", stdout)
+        llm_cache_put(cache_key, response.strip())
         logging.info(f"Raw LLM response: {response.strip()}")
         return response.strip()
     except subprocess.TimeoutExpired:
@@ -1009,22 +1521,76 @@ def validate_llm_response(response, expected_count):
             out_lines.append(f"{i}. Answer: {ans}\n   Citation: {ev}")
     return "\n".join(out_lines)
 
-def split_text_by_sentences(text, chunk_size=4000):
-    sentences = re.split(r"(?<=[.!?]) +", text)
-    chunks = []
-    current_chunk = ""
-    for sentence in sentences:
-        if len(current_chunk) + len(sentence) > chunk_size:
-            chunks.append(current_chunk.strip())
-            current_chunk = sentence
-        else:
-            current_chunk += " " + sentence
-    if current_chunk:
-        chunks.append(current_chunk.strip())
-    return chunks
+TOKEN_ESTIMATE_RE = re.compile(r"\w+|[^\w\s]")
+SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?]) +")
+WORD_SPAN_RE = re.compile(r"\S+")
+
+def estimate_tokens(text):
+    tokens = 0
+    for m in TOKEN_ESTIMATE_RE.finditer(text):
+        tokens += 1 + (m.end() - m.start() - 1) // TOKEN_CHARS_PER_PIECE
+    return tokens
+
+def sentence_spans(text, max_tokens):
+    start = 0
+    bounds = [(m.start(), m.end()) for m in SENTENCE_BREAK_RE.finditer(text)]
+    bounds.append((len(text), len(text)))
+    for end, next_start in bounds:
+        if end > start:
+            tokens = estimate_tokens(text[start:end])
+            if tokens <= max_tokens:
+                yield start, end, tokens
+            else:
+                # Sentence longer than a whole chunk: cut it at word boundaries
+                piece_start, piece_tokens = None, 0
+                for w in WORD_SPAN_RE.finditer(text, start, end):
+                    w_tokens = estimate_tokens(w.group())
+                    if piece_start is not None and piece_tokens + w_tokens > max_tokens:
+                        yield piece_start, piece_end, piece_tokens
+                        piece_start = None
+                    if piece_start is None:
+                        piece_start, piece_tokens = w.start(), 0
+                    piece_end = w.end()
+                    piece_tokens += w_tokens
+                if piece_start is not None:
+                    yield piece_start, piece_end, piece_tokens
+        start = next_start
+
+# Splits text at sentence boundaries into (start, end) offsets of at most
+# max_tokens estimated tokens; consecutive chunks share trailing sentences
+# worth up to overlap_tokens.
+def chunk_spans(text, max_tokens, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    sentences = list(sentence_spans(text, max_tokens))
+    spans = []
+    i = 0
+    while i < len(sentences):
+        j, total = i, 0
+        while j < len(sentences) and (j == i or total + sentences[j][2] <= max_tokens):
+            total += sentences[j][2]
+            j += 1
+        spans.append((sentences[i][0], sentences[j - 1][1]))
+        if j >= len(sentences):
+            break
+        k, carried = j, 0
+        while k - 1 > i and carried + sentences[k - 1][2] <= overlap_tokens:
+            k -= 1
+            carried += sentences[k][2]
+        i = k
+    return spans
+
+def chunk_token_budget(prompt_header):
+    header_tokens = estimate_tokens(prompt_header)
+    return max(256, LLM_CONTEXT_TOKENS - header_tokens - CHUNK_RESPONSE_TOKENS)
+
+def split_text_by_sentences(text, max_tokens=None, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    if max_tokens is None:
+        max_tokens = LLM_CONTEXT_TOKENS - CHUNK_RESPONSE_TOKENS
+    return [text[start:end] for start, end in chunk_spans(text, max_tokens, overlap_tokens)]
 
 def analyze_long_text_in_chunks_and_save(
-    cleaned_text, context_query, output_file, expected_count, progress_data=None, question_lines=None
+    cleaned_text, context_query, output_file, expected_count, progress_data=None, question_lines=None,
+    retrieval_mode=RETRIEVAL_MODE, top_k=RETRIEVAL_TOP_K, paper_progress=None,
+    checkpoint=None, on_section_written=None, paper_name=None, page_starts=None
 ):
     system_message = (
         "System: You are a conscientious assistant. Respond solely based on the provided excerpt. "
@@ -1044,101 +1610,299 @@ def analyze_long_text_in_chunks_and_save(
     if question_lines:
         kw_sets = [extract_keywords(q) for q in question_lines]
 
-    def sentence_chunks(text, chunk_size=4000):
-        sentences = re.split(r"(?<=[.!?]) +", text)
-        chunk, chunks = "", []
-        for s in sentences:
-            if len(chunk) + len(s) > chunk_size:
-                if chunk.strip():
-                    chunks.append(chunk.strip())
-                chunk = s
-            else:
-                chunk += " " + s
-        if chunk.strip():
-            chunks.append(chunk.strip())
-        return chunks
-
-    chunks = sentence_chunks(cleaned_text, chunk_size=4000)
-    with open(output_file, "w", encoding="utf-8") as f:
-        for i, chunk in enumerate(chunks):
-            if progress_data and progress_data.get("abort"):
-                logging.info("[ABORT] Analysis loop aborted")
-                return output_file
+    # Page a cleaned-text offset falls on (None without page offsets)
+    page_offsets = [offset for _, offset in page_starts or []]
+    def page_at(offset):
+        if not page_offsets:
+            return None
+        return page_starts[max(bisect_right(page_offsets, offset) - 1, 0)][0]
+
+    # block is the answer exactly as written to the result file
+    def section_record(i, n, verdict, answer=None, citation=None, block=None):
+        return {
+            "paper": paper_name,
+            "section": i + 1,
+            "question": n,
+            "verdict": verdict,
+            "answer": answer,
+            "citation": citation,
+            "block": block,
+            "chunk_start": spans[i][0],
+            "chunk_end": spans[i][1],
+            "page_start": page_at(spans[i][0]),
+            "page_end": page_at(spans[i][1] - 1),
+        }
 
-            if not chunk.strip():
-                f.write(f"\n\nResult for section {i+1}:\n")
-                f.write("\n".join(f"{j+1}. NO ANSWER!" for j in range(expected_count)))
-                continue
+    def no_answer_block(i):
+        result_text = f"\n\nResult for section {i+1}:\n" + "".join(
+            f"{j+1}. NO ANSWER!\n" for j in range(expected_count)
+        )
+        return result_text, [
+            section_record(i, j + 1, "not_evaluated", block="NO ANSWER!")
+            for j in range(expected_count)
+        ]
 
-            logging.info(f"Progress: section {i+1}/{len(chunks)}")
+    def evaluate_chunk(i, chunk):
+        if progress_data and progress_data.get("abort"):
+            return None
 
-            chunk_low = chunk.lower()
+        logging.info(f"Progress: section {i+1}/{len(chunks)}")
 
-            prompt = f"{full_prompt_header}\n\nSection {i+1}:\n{chunk}"
-            analysis_result = query_llm_via_cli(prompt)
+        chunk_low = chunk.lower()
 
-            validated_result = validate_llm_response(analysis_result, expected_count)
+        prompt = f"{full_prompt_header}\n\nSection {i+1}:\n{chunk}"
+        analysis_result = query_llm_via_cli(prompt)
 
-            blocks = list(re.finditer(r'(?ms)^\s*(\d+)\.\s*(.*?)(?=^\s*\d+\.|\Z)', validated_result))
-            rebuilt_blocks = []
+        validated_result = validate_llm_response(analysis_result, expected_count)
 
-            for m in blocks:
-                n = int(m.group(1))
-                block_text = m.group(2).strip()
+        blocks = list(re.finditer(r'(?ms)^\s*(\d+)\.\s*(.*?)(?=^\s*\d+\.|\Z)', validated_result))
+        rebuilt_blocks = []
+        records = []
 
-                if kw_sets and n <= len(kw_sets):
-                    kws = kw_sets[n-1]
-                    if kws and not any(k in chunk_low for k in kws):
-                        rebuilt_blocks.append(f"{n}. NO ANSWER!")
-                        continue
+        def reject(n, verdict, answer=None, citation=None):
+            rebuilt_blocks.append(f"{n}. NO ANSWER!")
+            records.append(section_record(i, n, verdict, answer, citation, "NO ANSWER!"))
 
-                first_line = block_text.splitlines()[0] if block_text else ""
-                if re.search(r'(?i)^\s*(answer:)?\s*no answer!?$', first_line):
-                    rebuilt_blocks.append(f"{n}. NO ANSWER!")
-                    continue
+        for m in blocks:
+            n = int(m.group(1))
+            block_text = m.group(2).strip()
 
-                ev_m = re.search(r'(?im)^\s*Citation:\s*[\"“]?(.+?)[\"”]?\s*$', block_text)
-                if not ev_m:
-                    rebuilt_blocks.append(f"{n}. NO ANSWER!")
+            if kw_sets and n <= len(kw_sets):
+                kws = kw_sets[n-1]
+                if kws and not any(k in chunk_low for k in kws):
+                    reject(n, "keywords_not_in_section")
                     continue
 
-                ev_text = ev_m.group(1).strip()
-                ev_low  = ev_text.lower()
+            first_line = block_text.splitlines()[0] if block_text else ""
+            if re.search(r'(?i)^\s*(answer:)?\s*no answer!?$', first_line):
+                reject(n, "no_answer")
+                continue
 
-                meta_patterns = [
-                    r"no(?:\s+\w+){0,3}\s+term",
-                    r"nowhere\s+in\s+the\s+text",
-                    r"not\s+mentioned",
-                    r"no\s+literal\s+quote",
-                    r"no\s+answer",
-                ]
-                if any(re.search(p, ev_low) for p in meta_patterns):
-                    rebuilt_blocks.append(f"{n}. NO ANSWER!")
-                    continue
+            answer_m = re.search(r'(?im)^\s*Answer:\s*(.+?)\s*$', block_text)
+            answer = answer_m.group(1) if answer_m else first_line.strip()
 
-                if len(ev_text) < 10 or ev_low not in chunk_low:
-                    rebuilt_blocks.append(f"{n}. NO ANSWER!")
-                    continue
+            ev_m = re.search(r'(?im)^\s*Citation:\s*[\"“]?(.+?)[\"”]?\s*$', block_text)
+            if not ev_m:
+                reject(n, "citation_missing", answer)
+                continue
 
-                if kw_sets and n <= len(kw_sets):
-                    kws = kw_sets[n-1]
-                    if kws and not any(k in ev_low for k in kws):
-                        rebuilt_blocks.append(f"{n}. NO ANSWER!")
-                        continue
+            ev_text = ev_m.group(1).strip()
+            ev_low  = ev_text.lower()
 
-                rebuilt_blocks.append(f"{n}. {block_text}")
+            meta_patterns = [
+                r"no(?:\s+\w+){0,3}\s+term",
+                r"nowhere\s+in\s+the\s+text",
+                r"not\s+mentioned",
+                r"no\s+literal\s+quote",
+                r"no\s+answer",
+            ]
+            if any(re.search(p, ev_low) for p in meta_patterns):
+                reject(n, "citation_meta", answer, ev_text)
+                continue
 
-            while len(rebuilt_blocks) < expected_count:
-                rebuilt_blocks.append(f"{len(rebuilt_blocks)+1}. NO ANSWER!")
+            if len(ev_text) < 10 or ev_low not in chunk_low:
+                reject(n, "citation_not_in_section", answer, ev_text)
+                continue
 
-            result_text = f"\n\nResult for section {i+1}:\n" + "\n".join(rebuilt_blocks) + "\n"
-            f.write(result_text)
+            if kw_sets and n <= len(kw_sets):
+                kws = kw_sets[n-1]
+                if kws and not any(k in ev_low for k in kws):
+                    reject(n, "keywords_not_in_citation", answer, ev_text)
+                    continue
 
-            logging.info("[CHECKED_RESULT] Section %d:\n%s", i + 1, result_text)
+            rebuilt_blocks.append(f"{n}. {block_text}")
+            records.append(section_record(i, n, "accepted", answer, ev_text, block_text))
+
+        while len(rebuilt_blocks) < expected_count:
+            reject(len(rebuilt_blocks) + 1, "missing")
+
+        result_text = f"\n\nResult for section {i+1}:\n" + "\n".join(rebuilt_blocks) + "\n"
+        logging.info("[CHECKED_RESULT] Section %d:\n%s", i + 1, result_text)
+        return result_text, records
+
+    max_tokens = chunk_token_budget(f"{full_prompt_header}\n\nSection {10 ** 4}:\n")
+    spans = chunk_spans(cleaned_text, max_tokens, CHUNK_OVERLAP_TOKENS)
+    chunks = [cleaned_text[span_start:span_end] for span_start, span_end in spans]
+    records_file = result_records_path(output_file)
+    start = 0
+    if checkpoint:
+        if (
+            checkpoint.get("sections_total") == len(chunks)
+            and "records_offset" in checkpoint
+            and os.path.exists(output_file)
+            and os.path.getsize(output_file) >= checkpoint["offset"]
+            and os.path.exists(records_file)
+            and os.path.getsize(records_file) >= checkpoint["records_offset"]
+        ):
+            start = checkpoint["section"]
+            with open(output_file, "r+b") as rf:
+                rf.truncate(checkpoint["offset"])
+            with open(records_file, "r+b") as rf:
+                rf.truncate(checkpoint["records_offset"])
+            logging.info(f"[CHECKPOINT] Resuming {os.path.basename(output_file)} at section {start + 1}/{len(chunks)}")
+        else:
+            logging.info(f"[CHECKPOINT] Checkpoint for {os.path.basename(output_file)} does not match, paper is analysed again")
+
+    mode = "a" if start else "w"
+    with open(output_file, mode, encoding="utf-8") as f, open(
+        records_file, mode, encoding="utf-8"
+    ) as jf, ThreadPoolExecutor(max_workers=LLM_MAX_WORKERS) as executor:
+        chunks_low = [chunk.lower() for chunk in chunks]
+        selected = None
+        if retrieval_mode == "bm25":
+            selected = bm25_select_chunks(chunks_low, kw_sets, expected_count, top_k)
+            if selected is not None:
+                logging.info(
+                    f"[RETRIEVAL] BM25 selected {len(selected)}/{len(chunks)} sections (top {top_k} per question)"
+                )
+
+        futures = []
+        for i, chunk in enumerate(chunks[start:], start=start):
+            if (
+                chunk.strip()
+                and (selected is None or i in selected)
+                and chunk_may_answer(chunks_low[i], kw_sets, expected_count)
+            ):
+                futures.append(executor.submit(evaluate_chunk, i, chunk))
+            else:
+                futures.append(None)
+
+        skipped = futures.count(None)
+        if progress_data is not None:
+            with analysis_progress_lock:
+                progress_data["llm_calls"] = progress_data.get("llm_calls", 0) + len(futures) - skipped
+                progress_data["llm_calls_saved"] = progress_data.get("llm_calls_saved", 0) + skipped
+        if paper_progress is not None:
+            paper_progress["sections_total"] = len(chunks)
+            paper_progress["sections_done"] = start
+        if skipped:
+            logging.info(
+                f"[PREFILTER] {skipped}/{len(chunks)} sections without question keywords, LLM calls skipped"
+            )
+
+        for i, future in enumerate(futures, start=start):
+            result = None
+            if not (progress_data and progress_data.get("abort")):
+                result = no_answer_block(i) if future is None else future.result()
+            if result is None:
+                logging.info("[ABORT] Analysis loop aborted")
+                for pending in futures:
+                    if pending is not None:
+                        pending.cancel()
+                return output_file
+            result_text, records = result
+            f.write(result_text)
+            for record in records:
+                jf.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if on_section_written is not None:
+                f.flush()
+                jf.flush()
+                on_section_written(i + 1, len(chunks), f.tell(), jf.tell())
+            if paper_progress is not None:
+                paper_progress["sections_done"] = i + 1
+            if progress_data is not None:
+                progress_data["llm_cache"] = llm_cache_snapshot()
 
     return output_file
 
-def run_analysis(analysis_id, pdf_directory, context_query, expected_count, question_lines=None):
+checkpoint_lock = threading.Lock()
+
+def append_checkpoint(output_folder, record):
+    with checkpoint_lock:
+        with open(os.path.join(output_folder, CHECKPOINT_FILENAME), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def load_checkpoints(output_folder):
+    checkpoints = {}
+    path = os.path.join(output_folder, CHECKPOINT_FILENAME)
+    if not os.path.exists(path):
+        return checkpoints
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "result" in record and "section" in record:
+                checkpoints[record["result"]] = record
+    return checkpoints
+
+def result_filename(pdf_filename, content_hash):
+    stem = re.sub(r"[^\w.-]+", "_", os.path.splitext(pdf_filename)[0])[:80]
+    return f"{RESULT_FILE_PREFIX}{stem}_{content_hash[:12]}.txt"
+
+def result_records_path(result_path):
+    return os.path.splitext(result_path)[0] + ".jsonl"
+
+def remove_result_files(output_folder, result_name):
+    result_path = os.path.join(output_folder, result_name)
+    for path in (result_path, result_records_path(result_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+def run_manifest_key(context_query, expected_count, retrieval_mode, top_k):
+    settings = [OLLAMA_MODEL, MODELFILE_DIRECTIVES, context_query, expected_count, retrieval_mode, top_k]
+    return hashlib.sha256(json.dumps(settings, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def load_manifest(output_folder, run_key):
+    manifest = {}
+    try:
+        with open(os.path.join(output_folder, MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        pass
+    if manifest.get("papers") and manifest.get("run_key") != run_key:
+        logging.info(f"[MANIFEST] Questions or settings changed, previous results in {output_folder} are removed")
+        # Results of other questions would be mixed into the sediment analysis
+        for entry in manifest["papers"].values():
+            remove_result_files(output_folder, entry["result"])
+        manifest = {}
+    return {"run_key": run_key, "papers": manifest.get("papers", {})}
+
+def latest_output_folder(pdf_dir_name, run_key):
+    pattern = re.compile(re.escape(pdf_dir_name) + r"_\d{4}-\d{2}-\d{2}")
+    candidates = sorted(
+        (d for d in os.listdir(DATA_ROOT) if pattern.fullmatch(d)), reverse=True
+    )
+    for d in candidates:
+        try:
+            with open(os.path.join(DATA_ROOT, d, MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+                if json.load(f).get("run_key") == run_key:
+                    return os.path.join(DATA_ROOT, d)
+        except (OSError, ValueError):
+            continue
+    return None
+
+def hash_pdf_files(pdf_directory, pdf_files, manifest):
+    # Files whose name, size and mtime match the manifest are not read again;
+    # unreadable files are returned in errors with the message
+    known = {entry["file"]: (h, entry) for h, entry in manifest["papers"].items()}
+    hashes, stats, errors = {}, {}, {}
+    for filename in pdf_files:
+        path = os.path.join(pdf_directory, filename)
+        try:
+            st = os.stat(path)
+            h, entry = known.get(filename, (None, {}))
+            if not (h and entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime_ns):
+                h = file_sha256(path)
+        except OSError as e:
+            logging.warning(f"[MANIFEST] Could not read {filename}: {e}")
+            errors[filename] = str(e)
+            continue
+        hashes[filename] = h
+        stats[filename] = {"size": st.st_size, "mtime": st.st_mtime_ns}
+    return hashes, stats, errors
+
+def save_manifest(output_folder, manifest):
+    path = os.path.join(output_folder, MANIFEST_FILENAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+def run_analysis(
+    analysis_id, pdf_directory, context_query, expected_count, question_lines=None,
+    retrieval_mode=RETRIEVAL_MODE, top_k=RETRIEVAL_TOP_K, output_folder=None, resume=False
+):
     global current_process
     try:
         logging.info(
@@ -1151,7 +1915,7 @@ def run_analysis(analysis_id, pdf_directory, context_query, expected_count, ques
             analysis_progress[analysis_id]["error"] = msg
             return
 
-        pdf_files = [f for f in os.listdir(pdf_directory) if f.endswith(".pdf")]
+        pdf_files = sorted(f for f in os.listdir(pdf_directory) if f.endswith(".pdf"))
         total_files = len(pdf_files)
         logging.info(
             f"[RUN_ANALYSIS] Found PDF files: {total_files} in {pdf_directory}"
@@ -1162,57 +1926,176 @@ def run_analysis(analysis_id, pdf_directory, context_query, expected_count, ques
             analysis_progress[analysis_id]["error"] = "No PDF files found."
             return
 
-        pdf_dir_name = os.path.basename(pdf_directory)
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        analysis_output_folder = os.path.join(
-            DATA_ROOT, f"{pdf_dir_name}_{current_date}"
-        )
+        analysis_output_folder = output_folder
+        if analysis_output_folder is None:
+            pdf_dir_name = os.path.basename(pdf_directory)
+            current_date = datetime.now().strftime("%Y-%m-%d")
+            analysis_output_folder = os.path.join(
+                DATA_ROOT, f"{pdf_dir_name}_{current_date}"
+            )
         os.makedirs(analysis_output_folder, exist_ok=True)
 
-        results_summary = []
-        for idx, filename in enumerate(pdf_files):
-            if analysis_progress[analysis_id].get("abort"):
-                analysis_progress[analysis_id]["status"] = "aborted"
-                logging.info("[RUN_ANALYSIS] Analysis aborted by user.")
-                with process_lock:
-                    current_process["analysis"] = False
+        checkpoints = {}
+        if resume:
+            checkpoints = load_checkpoints(analysis_output_folder)
+        elif os.path.exists(os.path.join(analysis_output_folder, CHECKPOINT_FILENAME)):
+            os.remove(os.path.join(analysis_output_folder, CHECKPOINT_FILENAME))
+
+        progress_data = analysis_progress[analysis_id]
+        results_summary = [None] * total_files
+        papers = {
+            f: {"status": "queued", "sections_done": 0, "sections_total": 0}
+            for f in pdf_files
+        }
+        progress_data["papers"] = papers
+        finished = {"count": 0}
+
+        def analyze_paper(idx, pdf_path, text_future):
+            filename = os.path.basename(pdf_path)
+            paper = papers[filename]
+            content_hash = content_hashes[filename]
+            result_name = result_filename(filename, content_hash)
+            if progress_data.get("abort"):
+                paper["status"] = "aborted"
                 return
 
-            pdf_path = os.path.join(pdf_directory, filename)
             logging.info(
                 f"[RUN_ANALYSIS] Processing {filename} ({idx+1}/{total_files}) ..."
             )
+            paper["status"] = "running"
+
+            def on_section_written(section, sections_total, offset, records_offset):
+                append_checkpoint(analysis_output_folder, {
+                    "file": filename,
+                    "result": result_name,
+                    "section": section,
+                    "sections_total": sections_total,
+                    "offset": offset,
+                    "records_offset": records_offset,
+                })
+
             try:
-                extracted_text, page_count = extract_text_from_pdf(
-                    pdf_path, abort_data=analysis_progress[analysis_id]
-                )
-                cleaned = clean_text(extracted_text)
+                cleaned, page_starts = text_future.result()
 
-                analysis_output_path = os.path.join(
-                    analysis_output_folder, f"analysis_result_paper{idx+1}.txt"
-                )
+                analysis_output_path = os.path.join(analysis_output_folder, result_name)
                 analyze_long_text_in_chunks_and_save(
                     cleaned,
                     context_query,
                     analysis_output_path,
                     expected_count,
-                    progress_data=analysis_progress[analysis_id],
+                    progress_data=progress_data,
                     question_lines=question_lines,
+                    retrieval_mode=retrieval_mode,
+                    top_k=top_k,
+                    paper_progress=paper,
+                    checkpoint=checkpoints.get(result_name),
+                    on_section_written=on_section_written,
+                    paper_name=filename,
+                    page_starts=page_starts,
                 )
-
-                results_summary.append(
+                if progress_data.get("abort"):
+                    paper["status"] = "aborted"
+                    return
+                with checkpoint_lock:
+                    manifest["papers"][content_hash] = {
+                        "file": filename,
+                        "result": result_name,
+                        "sections": paper["sections_total"],
+                        **file_stats[filename],
+                        "completed": datetime.now().isoformat(timespec="seconds"),
+                    }
+                    save_manifest(analysis_output_folder, manifest)
+
+                results_summary[idx] = (
                     f"Analysis for {filename} completed (result in {analysis_output_path})."
                 )
-
-                progress = int(((idx + 1) / total_files) * 100)
-                analysis_progress[analysis_id]["percent"] = progress
-                logging.info(f"[RUN_ANALYSIS] Progress: {progress}%")
+                paper["status"] = "completed"
             except Exception as e:
+                paper["status"] = "error"
+                paper["error"] = str(e)
                 logging.exception(
                     f"[RUN_ANALYSIS] Error processing {filename}: {e}"
                 )
-                continue
 
+            with analysis_progress_lock:
+                finished["count"] += 1
+                progress = int((finished["count"] / total_files) * 100)
+                progress_data["percent"] = progress
+            logging.info(f"[RUN_ANALYSIS] Progress: {progress}%")
+
+        try:
+            manifest = load_manifest(
+                analysis_output_folder,
+                run_manifest_key(context_query, expected_count, retrieval_mode, top_k),
+            )
+            content_hashes, file_stats, hash_errors = hash_pdf_files(pdf_directory, pdf_files, manifest)
+            current_hashes = set(content_hashes.values())
+            for content_hash, entry in list(manifest["papers"].items()):
+                filename = entry["file"]
+                if filename in content_hashes and content_hash not in current_hashes:
+                    remove_result_files(analysis_output_folder, entry["result"])
+                    del manifest["papers"][content_hash]
+                    logging.info(f"[MANIFEST] {filename} has changed, previous result {entry['result']} removed")
+            pending = []
+            first_with_hash = {}
+            for idx, filename in enumerate(pdf_files):
+                if filename in hash_errors:
+                    papers[filename].update(status="error", error=hash_errors[filename])
+                    finished["count"] += 1
+                    continue
+                content_hash = content_hashes[filename]
+                entry = manifest["papers"].get(content_hash)
+                first = first_with_hash.setdefault(content_hash, filename)
+                if entry and os.path.exists(os.path.join(analysis_output_folder, entry["result"])):
+                    if entry["file"] == filename:
+                        entry.update(file_stats[filename])
+                    analysis_output_path = os.path.join(analysis_output_folder, entry["result"])
+                    results_summary[idx] = f"Analysis for {filename} completed (result in {analysis_output_path})."
+                    papers[filename].update(
+                        status="completed", sections_done=entry["sections"], sections_total=entry["sections"]
+                    )
+                    finished["count"] += 1
+                elif first != filename:
+                    logging.info(f"[MANIFEST] {filename} has the same content as {first}, skipped")
+                    analysis_output_path = os.path.join(
+                        analysis_output_folder, result_filename(first, content_hash)
+                    )
+                    results_summary[idx] = f"{filename} has the same content as {first} (result in {analysis_output_path})."
+                    papers[filename]["status"] = "duplicate"
+                    finished["count"] += 1
+                else:
+                    pending.append(idx)
+            if len(pending) < total_files:
+                save_manifest(analysis_output_folder, manifest)
+                progress_data["percent"] = int((finished["count"] / total_files) * 100)
+                logging.info(f"[MANIFEST] {total_files - len(pending)}/{total_files} papers already analysed, results reused")
+        except Exception as e:
+            msg = f"Could not prepare the analysis in {analysis_output_folder}: {e}"
+            logging.exception(f"[RUN_ANALYSIS] {msg}")
+            analysis_progress[analysis_id]["status"] = "error"
+            analysis_progress[analysis_id]["error"] = msg
+            return
+
+        prepared_texts = prefetch_cleaned_texts(
+            [os.path.join(pdf_directory, pdf_files[idx]) for idx in pending],
+            abort_data=progress_data,
+        )
+        running = set()
+        with ThreadPoolExecutor(max_workers=PAPER_CONCURRENCY) as paper_pool:
+            for idx, (pdf_path, text_future) in zip(pending, prepared_texts):
+                if progress_data.get("abort"):
+                    break
+                if len(running) >= PAPER_CONCURRENCY:
+                    _, running = wait(running, return_when=FIRST_COMPLETED)
+                running.add(paper_pool.submit(analyze_paper, idx, pdf_path, text_future))
+            prepared_texts.close()
+
+        if progress_data.get("abort"):
+            progress_data["status"] = "aborted"
+            logging.info("[RUN_ANALYSIS] Analysis aborted by user.")
+            return
+
+        results_summary = [r for r in results_summary if r]
         if not analysis_progress[analysis_id].get("error"):
             analysis_progress[analysis_id]["status"] = "completed"
             analysis_progress[analysis_id]["result"] = "\n".join(results_summary)
@@ -1272,66 +2155,213 @@ def tokenize_texts(text_data):
     ]
     return tokenized_texts
 
-def find_optimal_num_topics(texts, min_topics=2, max_topics=15, step=1, alpha_value="auto", beta_value="auto", abort_data=None):
-    tokenized_texts = tokenize_texts(texts)
+def prepare_lda_corpus(text_data):
+    cache_prefix = None
+    if LDA_CORPUS_CACHE_ENABLED:
+        key = hashlib.sha256(
+            json.dumps([LDA_CORPUS_CACHE_VERSION, text_data], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        cache_prefix = os.path.join(LDA_CORPUS_CACHE_ROOT, key[:2], key)
+        if os.path.exists(f"{cache_prefix}.tokens.json"):
+            try:
+                with open(f"{cache_prefix}.tokens.json", "r", encoding="utf-8") as f:
+                    tokenized_texts = json.load(f)
+                dictionary = Dictionary.load(f"{cache_prefix}.dict")
+                corpus = [
+                    [(token_id, int(count)) for token_id, count in doc]
+                    for doc in MmCorpus(f"{cache_prefix}.mm")
+                ]
+                logging.info(f"[LDA_CACHE] Cached corpus used ({len(tokenized_texts)} answers)")
+                return tokenized_texts, dictionary, corpus
+            except (OSError, ValueError) as e:
+                logging.warning(f"[LDA_CACHE] Could not read cached corpus: {e}")
+
+    tokenized_texts = tokenize_texts(text_data)
     dictionary = Dictionary(tokenized_texts)
     corpus = [dictionary.doc2bow(text) for text in tokenized_texts]
 
-    coherence_scores = []
-    for num_topics in range(min_topics, max_topics + 1, step):
-        if abort_data and abort_data.get("abort"):
-            logging.info("[ABORT] Topic search aborted")
-            return 0
-
-        lda_model = LdaModel(
-            corpus=corpus,
-            id2word=dictionary,
-            num_topics=num_topics,
-            random_state=42,
-            iterations=100,
-            passes=10,
-            alpha=alpha_value,
-            eta=beta_value,
+    if cache_prefix:
+        try:
+            os.makedirs(os.path.dirname(cache_prefix), exist_ok=True)
+            dictionary.save(f"{cache_prefix}.dict")
+            MmCorpus.serialize(f"{cache_prefix}.mm", corpus)
+            # The token file is written last and marks the entry as complete
+            tmp_path = f"{cache_prefix}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(tokenized_texts, f, ensure_ascii=False)
+            os.replace(tmp_path, f"{cache_prefix}.tokens.json")
+        except OSError as e:
+            logging.warning(f"[LDA_CACHE] Could not write cached corpus: {e}")
+    return tokenized_texts, dictionary, corpus
+
+def train_lda(corpus, dictionary, num_topics, alpha_value="auto", beta_value="auto"):
+    params = dict(
+        corpus=corpus,
+        id2word=dictionary,
+        num_topics=num_topics,
+        random_state=42,
+        iterations=100,
+        passes=10,
+        alpha=alpha_value,
+        eta=beta_value,
+    )
+    if LDA_BACKEND == "multicore":
+        if alpha_value == "auto":
+            params["alpha"] = "symmetric"
+        return LdaMulticore(workers=LDA_WORKERS, **params)
+    return LdaModel(**params)
+
+# Top words of every topic, as CoherenceModel uses them for c_v
+def coherence_topics(lda_model, topn=20):
+    return [matutils.argsort(topic, topn=topn, reverse=True) for topic in lda_model.get_topics()]
+
+# c_v coherence of a batch of models (num_topics -> model). The sliding-window
+# statistics are collected once for the union of the models' top words and
+# shared; same pipeline and values as CoherenceModel(coherence="c_v"). The scan
+# runs in one process since it only counts the top words.
+def score_topic_batch(models, tokenized_texts, dictionary):
+    if not models:
+        return {}
+    measure = COHERENCE_MEASURES["c_v"]
+    topics = {num_topics: coherence_topics(model) for num_topics, model in models.items()}
+    segmented = {num_topics: measure.seg(model_topics) for num_topics, model_topics in topics.items()}
+    accumulator = measure.prob(
+        texts=tokenized_texts,
+        segmented_topics=[segment for segments in segmented.values() for segment in segments],
+        dictionary=dictionary,
+        window_size=SLIDING_WINDOW_SIZES["c_v"],
+        processes=1,
+    )
+    scores = {}
+    for num_topics, model_topics in topics.items():
+        confirmed = measure.conf(
+            segmented[num_topics],
+            accumulator,
+            topics=model_topics,
+            measure="nlr",
+            gamma=1,
+            with_std=False,
+            with_support=False,
         )
-        coherence_model = CoherenceModel(
-            model=lda_model,
-            texts=tokenized_texts,
-            dictionary=dictionary,
-            coherence="c_v",
+        scores[num_topics] = measure.aggr(confirmed)
+    return scores
+
+# Dictionary and corpus of the current question, set once per worker process by
+# the pool initializer instead of being pickled with every task
+topic_search_data = {}
+
+def init_topic_search_worker(dictionary, corpus):
+    topic_search_data.update(dictionary=dictionary, corpus=corpus)
+
+def topic_search_task(num_topics, alpha_value, beta_value):
+    return train_lda(
+        topic_search_data["corpus"],
+        topic_search_data["dictionary"],
+        num_topics,
+        alpha_value,
+        beta_value,
+    )
+
+def find_optimal_num_topics(texts, min_topics=2, max_topics=15, step=1, alpha_value="auto", beta_value="auto", abort_data=None, report_path=None):
+    tokenized_texts, dictionary, corpus = prepare_lda_corpus(texts)
+
+    topic_counts = list(range(min_topics, max_topics + 1, step))
+    scores = {}
+    best = {"num_topics": None, "model": None}
+    executor = None
+    if TOPIC_SEARCH_WORKERS > 1 and len(topic_counts) > 1 and LDA_BACKEND == "single":
+        executor = ProcessPoolExecutor(
+            max_workers=min(TOPIC_SEARCH_WORKERS, len(topic_counts)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_topic_search_worker,
+            initargs=(dictionary, corpus),
         )
-        coherence_score = coherence_model.get_coherence()
-        coherence_scores.append(coherence_score)
-        logging.info(f"Number of topics: {num_topics} -- Coherence: {coherence_score:.4f}")
 
-    optimal_topics = range(min_topics, max_topics + 1, step)[
-        np.argmax(coherence_scores)
-    ]
-    logging.info(f"Optimal number of topics: {optimal_topics}")
-    return optimal_topics
+    # Trains the given counts (in the pool if there is one), scores them together
+    # and keeps the best model
+    def evaluate(counts):
+        if not counts:
+            return True
+        futures = []
+        if executor is not None:
+            futures = [
+                executor.submit(topic_search_task, num_topics, alpha_value, beta_value)
+                for num_topics in counts
+            ]
+        models = {}
+        for i, num_topics in enumerate(counts):
+            if abort_data and abort_data.get("abort"):
+                logging.info("[ABORT] Topic search aborted")
+                for pending in futures:
+                    pending.cancel()
+                return False
+            if futures:
+                models[num_topics] = futures[i].result()
+            else:
+                models[num_topics] = train_lda(corpus, dictionary, num_topics, alpha_value, beta_value)
+        for num_topics, coherence_score in score_topic_batch(models, tokenized_texts, dictionary).items():
+            scores[num_topics] = coherence_score
+            best_topics = best["num_topics"]
+            if best_topics is None or (coherence_score, -num_topics) > (scores[best_topics], -best_topics):
+                best.update(num_topics=num_topics, model=models[num_topics])
+            logging.info(f"Number of topics: {num_topics} -- Coherence: {coherence_score:.4f}")
+        return True
+
+    try:
+        if TOPIC_SEARCH_STRATEGY == "coarse" and len(topic_counts) > TOPIC_SEARCH_COARSE_STEP:
+            coarse = topic_counts[::TOPIC_SEARCH_COARSE_STEP]
+            batch = TOPIC_SEARCH_WORKERS if executor is not None else 1
+            for start in range(0, len(coarse), batch):
+                if not evaluate(coarse[start:start + batch]):
+                    return 0, None, None, None, None
+                evaluated = coarse[:start + batch]
+                if len(evaluated) - 1 - evaluated.index(best["num_topics"]) >= TOPIC_SEARCH_PATIENCE:
+                    break
+            # Refine between the coarse neighbours of the best count
+            i = topic_counts.index(best["num_topics"])
+            fine = [
+                num_topics
+                for num_topics in topic_counts[max(0, i - TOPIC_SEARCH_COARSE_STEP + 1):i + TOPIC_SEARCH_COARSE_STEP]
+                if num_topics not in scores
+            ]
+            if not evaluate(fine):
+                return 0, None, None, None, None
+        elif not evaluate(topic_counts):
+            return 0, None, None, None, None
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    optimal_topics = best["num_topics"]
+    logging.info(f"Optimal number of topics: {optimal_topics} ({len(scores)} of {len(topic_counts)} counts trained)")
+    if report_path:
+        report = {
+            "strategy": TOPIC_SEARCH_STRATEGY,
+            "topic_range": [min_topics, max_topics, step],
+            "optimal_topics": optimal_topics,
+            "trained": len(scores),
+            "evaluated": [
+                {"num_topics": num_topics, "coherence": score}
+                for num_topics, score in scores.items()
+            ],
+        }
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logging.info(f"[SEDIMENT] Topic search report saved in {report_path}")
+    return optimal_topics, best["model"], dictionary, corpus, tokenized_texts
 
 def perform_lda(text_data, num_topics, alpha_value="auto", beta_value="auto", abort_data=None):
     if abort_data and abort_data.get("abort"):
         logging.info("[ABORT] LDA training not started")
         return None, None, None, None
 
-    tokenized_texts = tokenize_texts(text_data)
-    dictionary = Dictionary(tokenized_texts)
-    corpus = [dictionary.doc2bow(text) for text in tokenized_texts]
+    tokenized_texts, dictionary, corpus = prepare_lda_corpus(text_data)
 
     if abort_data and abort_data.get("abort"):
         logging.info("[ABORT] LDA training aborted")
         return None, None, None, None
 
-    lda_model = LdaModel(
-        corpus=corpus,
-        id2word=dictionary,
-        num_topics=num_topics,
-        random_state=42,
-        iterations=100,
-        passes=10,
-        alpha=alpha_value,
-        eta=beta_value,
-    )
+    lda_model = train_lda(corpus, dictionary, num_topics, alpha_value, beta_value)
     return lda_model, dictionary, corpus, tokenized_texts
 
 def visualize_lda(
@@ -1625,21 +2655,36 @@ def get_combined_prompt(top_terms_freq, top_terms_excl, question_text):
     """
     return prompt
 
-def query_ollama(input_text, model="llama3.1p"):
+def query_ollama(input_text, model=OLLAMA_MODEL):
+    cache_key = llm_cache_key(model, input_text)
+    cached = llm_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    if LLM_BACKEND == "http":
+        with llm_slots:
+            response = query_ollama_api(input_text, model)
+        if response is None:
+            return "Interpretation not possible"
+        llm_cache_put(cache_key, response)
+        return response
+
     try:
-        process = subprocess.Popen(
-            ["ollama", "run", model],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-        )
-        stdout, stderr = process.communicate(input=input_text, timeout=180)
+        with llm_slots:
+            process = subprocess.Popen(
+                ["ollama", "run", model],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            )
+            stdout, stderr = process.communicate(input=input_text, timeout=LLM_TIMEOUT)
         if process.returncode != 0:
             print(f"Error during model request: {stderr.strip()}")
             return "Interpretation not possible"
+        llm_cache_put(cache_key, stdout.strip())
         return stdout.strip()
     except Exception as e:
         print(f"An error occurred: {e}")
@@ -1659,24 +2704,28 @@ def save_interpretations_to_txt(interpretations, file_path):
             file.write("\n" + "-" * 50 + "\n")
     print(f"Interpretations saved to '{file_path}'.")
 
-def lda_analysis_with_interpretation(file_path, question_id, num_topics, model="llama3.1p", output_directory=None, abort_data=None):
+# Reuses lda_result (model, dictionary, corpus) from the topic search; without it
+# the answers are read and the model is trained here
+def lda_analysis_with_interpretation(file_path, question_id, num_topics, model=OLLAMA_MODEL, output_directory=None, abort_data=None, lda_result=None):
     try:
 
         if abort_data and abort_data.get("abort"):
             logging.info(f"[LDA] Abort detected before starting analysis for question {question_id}.")
             return
 
-        data = pd.read_csv(file_path, encoding="utf-8")
-        text_data = data[f"Question {question_id} Answers"].dropna().tolist()
-        if not text_data:
-            print(f"No data available for LDA analysis of question {question_id}.")
-            return
+        if lda_result is not None:
+            lda_model, dictionary, corpus = lda_result
+        else:
+            text_data = read_answers(file_path, question_id)
+            if not text_data:
+                print(f"No data available for LDA analysis of question {question_id}.")
+                return
 
-        lda_model, dictionary, corpus, _ = perform_lda(
-            text_data, num_topics, abort_data=abort_data
-        )
-        if lda_model is None:
-            return
+            lda_model, dictionary, corpus, _ = perform_lda(
+                text_data, num_topics, abort_data=abort_data
+            )
+            if lda_model is None:
+                return
 
         if abort_data and abort_data.get("abort"):
             logging.info("[ABORT] Aborted after LDA training")
@@ -1770,7 +2819,7 @@ def lda_analysis_with_interpretation(file_path, question_id, num_topics, model="
                 dictionary=dictionary,
                 corpus=corpus,
                 sorted_topic_indices=sorted_topic_indices,
-                num_topics=optimal_topics,
+                num_topics=num_topics,
                 lambda_val=1.0,
                 p_w=p_w,
                 output_html=os.path.join(
@@ -1783,7 +2832,7 @@ def lda_analysis_with_interpretation(file_path, question_id, num_topics, model="
                 dictionary=dictionary,
                 corpus=corpus,
                 sorted_topic_indices=sorted_topic_indices,
-                num_topics=optimal_topics,
+                num_topics=num_topics,
                 lambda_val=0.0,
                 p_w=p_w,
                 output_html=os.path.join(
@@ -1803,40 +2852,103 @@ def lda_analysis_with_interpretation(file_path, question_id, num_topics, model="
             f"Error in lda_analysis_with_interpretation for question {question_id}: {e}"
         )
 
-def load_text_files(directory):
-    data = []
-    for filename in os.listdir(directory):
-        if not filename.endswith(".txt"):
-            continue
-        path = os.path.join(directory, filename)
-        content = None
-        for encoding in ("utf-8", "utf-8-sig", "latin-1"):
+# Decodes a result file with a single read: UTF-8 with or without BOM, Latin-1
+# for files that are not valid UTF-8. Windows line endings are normalised as
+# in text mode.
+def read_result_file(path):
+    with open(path, "rb") as file:
+        raw = file.read()
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = raw.decode("latin-1")
+    return text.replace("\r\n", "\n")
+
+# Result files of an analysis folder; questions.txt sits next to them and is not one
+def iter_result_files(directory):
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".txt") and filename != QUESTIONS_FILENAME:
+            yield os.path.join(directory, filename)
+
+def iter_text_files(directory):
+    for result_path in iter_result_files(directory):
+        content = read_result_file(result_path).strip()
+        if content:
+            yield content
+
+def read_result_records(records_path):
+    responses = {}
+    with open(records_path, "r", encoding="utf-8") as f:
+        for line in f:
             try:
-                with open(path, "r", encoding=encoding, errors="strict") as file:
-                    content = file.read().strip()
-                break
-            except UnicodeDecodeError:
+                record = json.loads(line)
+            except json.JSONDecodeError:
                 continue
-        if content is None:
-            with open(path, "r", encoding="utf-8", errors="replace") as file:
-                content = file.read().strip()
-        if content:
-            data.append(content)
-    return data
+            responses.setdefault(record["question"], []).append(record["block"])
+    return responses
+
+def write_answer_store(evaluation_folder, responses_by_question):
+    if ANSWER_STORE_FORMAT != "parquet":
+        return None
+    if pq is None:
+        logging.warning("[SEDIMENT] pyarrow is not installed, answers are stored as CSV")
+        return None
+    store = os.path.join(evaluation_folder, ANSWER_STORE_DIRNAME)
+    table = pa.table({
+        "question_id": [q_id for q_id, responses in responses_by_question.items() for _ in responses],
+        "answer": [r for responses in responses_by_question.values() for r in responses],
+    })
+    pq.write_to_dataset(table, store, partition_cols=["question_id"])
+    return store
+
+# Reads the answers of one question from the Parquet store (a directory) or
+# from the per-question CSV file
+def read_answers(source, question_id):
+    if os.path.isdir(source):
+        table = pq.read_table(
+            source, columns=["answer"], filters=[("question_id", "=", question_id)]
+        )
+        return [answer for answer in table.column("answer").to_pylist() if answer]
+    data = pd.read_csv(source, encoding="utf-8")
+    return data[f"Question {question_id} Answers"].dropna().tolist()
+
+# Line-oriented parser for the text result files: a "Result for section N:"
+# line starts a section, a line starting with "N." starts the answer to
+# question N, and every other line continues the current answer. One pass
+# over the lines, no backtracking on large files.
+RESULT_SECTION_HEADER_RE = re.compile(r"Result for section \d+:")
+RESULT_ANSWER_START_RE = re.compile(r"(\d+)\.\s*(.*)")
+
+def iter_result_answers(text):
+    in_section = False
+    question_id = None
+    lines = []
+    for line in text.split("\n"):
+        if RESULT_SECTION_HEADER_RE.match(line):
+            if question_id is not None:
+                yield question_id, "\n".join(lines).strip()
+            in_section = True
+            question_id = None
+            continue
+        if not in_section:
+            continue
+        m = RESULT_ANSWER_START_RE.match(line)
+        if m:
+            if question_id is not None:
+                yield question_id, "\n".join(lines).strip()
+            question_id = int(m.group(1))
+            lines = [m.group(2)]
+        elif question_id is not None:
+            lines.append(line)
+    if question_id is not None:
+        yield question_id, "\n".join(lines).strip()
 
 def categorize_responses_by_question(data):
     all_sections = {}
     for text in data:
-        pattern_section = (
-            r"Result for section \d+:\s*((?:(?:\d+\.\s*.*?(?=\n\d+\.|\Z)))+)"
-        )
-        sections = re.findall(pattern_section, text, re.DOTALL)
-        print(f"DEBUG: Sections found: {sections}")
-        for idx, sec in enumerate(sections, start=1):
-            answers = re.findall(r"\d+\.\s*(.*?)(?=\n\d+\.|\Z)", sec, re.DOTALL)
-            answers = [ans.strip() for ans in answers]
-            if answers:
-                all_sections.setdefault(idx, []).extend(answers)
+        for question_id, answer in iter_result_answers(text):
+            all_sections.setdefault(question_id, []).append(answer)
+    logging.debug("[SEDIMENT] Answers parsed: %s", all_sections)
     return all_sections
 
 def sediment_analysis(directory, analysis_id):
@@ -1844,16 +2956,36 @@ def sediment_analysis(directory, analysis_id):
     logging.info(f"[SEDIMENT] STARTED for {directory}, analysis_id={analysis_id}")
     sediment_progress[analysis_id].update(status="running", percent=0)
 
-    data = load_text_files(directory)
-    if not data:
+    # Result files with a structured sibling (.jsonl) are read from the records,
+    # older ones are parsed; both give the same answer blocks
+    responses_by_question = {}
+    structured = text_files = 0
+    for result_path in iter_result_files(directory):
+        records_path = result_records_path(result_path)
+        if os.path.exists(records_path):
+            structured += 1
+            answers = read_result_records(records_path)
+        else:
+            text = read_result_file(result_path).strip()
+            if not text:
+                continue
+            text_files += 1
+            answers = categorize_responses_by_question([text])
+        for q_id, responses in answers.items():
+            responses_by_question.setdefault(q_id, []).extend(responses)
+    responses_by_question = dict(sorted(responses_by_question.items()))
+    logging.info(
+        f"[SEDIMENT] {sum(len(r) for r in responses_by_question.values())} "
+        f"answers loaded ({structured} structured, {text_files} text result files)"
+    )
+    if not responses_by_question:
         logging.error("[SEDIMENT] No texts found")
         sediment_progress[analysis_id].update(
             status="error", error="No texts found"
         )
         return
 
-    responses_by_question = categorize_responses_by_question(data)
-    logging.info(f"[SEDIMENT] Answers by question: {responses_by_question}")
+    logging.debug("[SEDIMENT] Answers by question: %s", responses_by_question)
 
     filtered_responses = {
         q_id: [r for r in responses if "no answer" not in r.lower()]
@@ -1866,7 +2998,7 @@ def sediment_analysis(directory, analysis_id):
     os.makedirs(evaluation_folder, exist_ok=True)
     logging.info(f"[SEDIMENT] Evaluation folder: {evaluation_folder}")
 
-    questions_file = os.path.join(directory, "questions.txt")
+    questions_file = os.path.join(directory, QUESTIONS_FILENAME)
     if os.path.exists(questions_file):
         with open(questions_file, "r", encoding="utf-8") as f:
             questions = [line.strip() for line in f if line.strip()]
@@ -1881,10 +3013,27 @@ def sediment_analysis(directory, analysis_id):
             status="error", error="No valid answers found"
         )
         return
+    # The topic search reads each question's answers back from the store
+    # (Parquet or one CSV per question), so the answers of all questions are
+    # not kept in memory during the LDA stage
+    answer_store = write_answer_store(evaluation_folder, filtered_responses)
+    if answer_store is None:
+        for q_id, responses in filtered_responses.items():
+            if q_id > len(questions):
+                continue
+            question_folder = os.path.join(evaluation_folder, f"question_{q_id}")
+            os.makedirs(question_folder, exist_ok=True)
+            csv_path = os.path.join(question_folder, f"question_{q_id}_responses.csv")
+            df = pd.DataFrame({f"Question {q_id} Answers": responses})
+            df.to_csv(csv_path, index=False, encoding="utf-8")
+            logging.info(f"[SEDIMENT] Answers for question {q_id} saved in {csv_path}")
+    question_ids = list(filtered_responses)
+    del responses_by_question, filtered_responses
     sediment_progress[analysis_id].update(percent=10)
-    logging.info("[SEDIMENT] CSV export completed, starting LDA analysis")
+    if answer_store:
+        logging.info(f"[SEDIMENT] Answers saved in {answer_store}, starting LDA analysis")
 
-    for idx, (q_id, responses) in enumerate(filtered_responses.items(), start=1):
+    for idx, q_id in enumerate(question_ids, start=1):
         if sediment_progress[analysis_id].get("abort"):
             logging.info("[ABORT] Sediment loop aborted")
             sediment_progress[analysis_id].update(status="aborted")
@@ -1911,10 +3060,13 @@ def sediment_analysis(directory, analysis_id):
         ) as f:
             f.write(question_text)
 
-        df = pd.DataFrame({f"Question {q_id} Answers": responses})
-        csv_path = os.path.join(question_folder, f"question_{q_id}_responses.csv")
-        df.to_csv(csv_path, index=False, encoding="utf-8")
-        logging.info(f"[SEDIMENT] Answers for question {q_id} saved in {csv_path}")
+        answer_source = answer_store or os.path.join(
+            question_folder, f"question_{q_id}_responses.csv"
+        )
+        responses = read_answers(answer_source, q_id)
+        if not responses:
+            logging.warning(f"[SEDIMENT] No stored answers for question {q_id}")
+            continue
 
         percent = 10 + int((idx / total_questions) * 80)
         sediment_progress[analysis_id].update(percent=percent)
@@ -1922,9 +3074,10 @@ def sediment_analysis(directory, analysis_id):
             f"[SEDIMENT] Question {q_id}/{total_questions} processed, progress {percent}%"
         )
 
-        optimal_topics = find_optimal_num_topics(
+        optimal_topics, lda_model, dictionary, corpus, _ = find_optimal_num_topics(
             responses, min_topics=2, max_topics=15,
-            step=1, abort_data=sediment_progress[analysis_id]
+            step=1, abort_data=sediment_progress[analysis_id],
+            report_path=os.path.join(question_folder, TOPIC_SEARCH_REPORT_FILENAME),
         )
 
         logging.info(f"[SEDIMENT] Optimal topics for question {q_id}: {optimal_topics}")
@@ -1937,13 +3090,15 @@ def sediment_analysis(directory, analysis_id):
             return
 
         lda_analysis_with_interpretation(
-            csv_path,
+            answer_source,
             q_id,
             num_topics=optimal_topics,
-            model="llama3.1p",
+            model=OLLAMA_MODEL,
             output_directory=question_folder,
             abort_data=sediment_progress[analysis_id],
+            lda_result=(lda_model, dictionary, corpus),
         )
+        sediment_progress[analysis_id].update(llm_cache=llm_cache_snapshot())
         logging.info(
             f"[SEDIMENT] LDA analysis and interpretation for question {q_id} completed"
         )
@@ -2845,7 +4000,11 @@ document.addEventListener('DOMContentLoaded', function() {
         .then(resp => resp.json())
         .then(progressData => {
           analyseProgressBar.value = progressData.percent || 0;
-          analyseProgressText.innerText = (progressData.percent || 0) + "% completed";
+          const runningPapers = Object.entries(progressData.papers || {})
+            .filter(([name, paper]) => paper.status === "running")
+            .map(([name, paper]) => `${name} ${paper.sections_done}/${paper.sections_total}`);
+          analyseProgressText.innerText = (progressData.percent || 0) + "% completed"
+            + (runningPapers.length ? ` (${runningPapers.join(", ")})` : "");
           if (["completed","error","aborted"].includes(progressData.status)) {
               clearInterval(analysisInterval);
               analyseSpinner.style.display = "none";
@@ -2998,6 +4157,17 @@ def start_analysis():
     if not pdf_directory or not questions:
         return jsonify({"error": "Please provide both a PDF directory and questions."})
 
+    retrieval_mode = str(data.get("retrieval_mode") or RETRIEVAL_MODE).lower()
+    if retrieval_mode not in ("full", "bm25"):
+        return jsonify({"error": "retrieval_mode must be 'full' or 'bm25'."})
+    raw_top_k = data.get("top_k")
+    try:
+        top_k = RETRIEVAL_TOP_K if raw_top_k is None else int(raw_top_k)
+    except (TypeError, ValueError):
+        top_k = 0
+    if top_k < 1:
+        return jsonify({"error": "top_k must be a positive integer."})
+
     with process_lock:
         if current_process.get("analysis"):
             return (jsonify({"error": "An analysis process is already running."}), 400)
@@ -3029,13 +4199,30 @@ def start_analysis():
     pdf_dir_name = os.path.basename(pdf_directory)
     current_date = datetime.now().strftime("%Y-%m-%d")
     analysis_output_folder = os.path.join(DATA_ROOT, f"{pdf_dir_name}_{current_date}")
+    if data.get("incremental", INCREMENTAL_ANALYSIS):
+        run_key = run_manifest_key(context_query, expected_count, retrieval_mode, top_k)
+        analysis_output_folder = (
+            latest_output_folder(pdf_dir_name, run_key) or analysis_output_folder
+        )
+        logging.info(f"[START_ANALYSIS] Incremental mode, continuing in {analysis_output_folder}")
     os.makedirs(analysis_output_folder, exist_ok=True)
 
-    questions_file = os.path.join(analysis_output_folder, "questions.txt")
+    questions_file = os.path.join(analysis_output_folder, QUESTIONS_FILENAME)
     with open(questions_file, "w", encoding="utf-8") as f:
         for q in question_lines:
             f.write(q + "\n")
 
+    run_params = {
+        "pdf_directory": pdf_directory,
+        "context_query": context_query,
+        "expected_count": expected_count,
+        "question_lines": question_lines,
+        "retrieval_mode": retrieval_mode,
+        "top_k": top_k,
+    }
+    with open(os.path.join(analysis_output_folder, RUN_PARAMS_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(run_params, f, ensure_ascii=False, indent=2)
+
     thread = threading.Thread(
         target=run_analysis,
         args=(
@@ -3044,6 +4231,53 @@ def start_analysis():
             context_query,
             expected_count,
             question_lines,  
+            retrieval_mode,
+            top_k,
+            analysis_output_folder,
+        ),
+    )
+    thread.daemon = False
+    thread.start()
+    return jsonify({"analysis_id": analysis_id})
+
+@app.route("/resume_analysis", methods=["POST"])
+def resume_analysis():
+    global current_process
+    data = request.get_json()
+    output_folder = data.get("output_folder")
+
+    logging.info(f"[RESUME_ANALYSIS] Request received: output_folder={output_folder}")
+
+    if not output_folder:
+        return jsonify({"error": "Please provide the analysis output folder to resume."})
+
+    analysis_output_folder = os.path.join(DATA_ROOT, os.path.basename(output_folder))
+    params_file = os.path.join(analysis_output_folder, RUN_PARAMS_FILENAME)
+    if not os.path.exists(params_file):
+        return jsonify({"error": f"No resumable analysis found in {output_folder}."})
+    with open(params_file, "r", encoding="utf-8") as f:
+        run_params = json.load(f)
+
+    with process_lock:
+        if current_process.get("analysis"):
+            return (jsonify({"error": "An analysis process is already running."}), 400)
+        current_process["analysis"] = True
+
+    analysis_id = str(uuid.uuid4())
+    analysis_progress[analysis_id] = {"status": "starting", "percent": 0}
+
+    thread = threading.Thread(
+        target=run_analysis,
+        args=(
+            analysis_id,
+            os.path.join(DOWNLOAD_ROOT, run_params["pdf_directory"]),
+            run_params["context_query"],
+            run_params["expected_count"],
+            run_params["question_lines"],
+            run_params["retrieval_mode"],
+            run_params["top_k"],
+            analysis_output_folder,
+            True,
         ),
     )
     thread.daemon = False
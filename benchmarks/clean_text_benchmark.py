@@ -0,0 +1,125 @@
+"""
+Compares clean_text() of a FACTS app against the former regex cascade on a
+folder of PDFs and reports timings and any output mismatches.
+
+Usage:
+    python benchmarks/clean_text_benchmark.py PDF_FOLDER [--app app.py] [--repeat 5]
+
+The legacy cascade below is the pre-compiled version of clean_text with the
+two pattern fixes applied (hyphen class and fixed-width lookbehind), so a
+mismatch points at the restructuring and not at those fixes.
+"""
+import argparse
+import importlib.util
+import os
+import re
+import sys
+import time
+import unicodedata
+
+
+def legacy_clean_text_en(text, remove_list_numbers=True, remove_page_headers=True):
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\u00ad", "")
+    text = re.sub(r"(\w+)-\n(\w+)", r"\1\2", text)
+    text = re.sub(r"(\w)[-–]\s+(\w)", r"\1\2", text)
+    if remove_page_headers:
+        text = re.sub(r"(?i)\n\s*Page\s+\d+\s*\n", "\n", text)
+        text = re.sub(r"\n\s*\d+\s*\n", "\n", text)
+    text = re.sub(r"\n+", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    if remove_list_numbers:
+        text = re.sub(r"(?<!\S)\d+\.\s+", "", text)
+    return text
+
+
+def legacy_clean_text_de(text):
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\u00ad", "")
+    text = re.sub(r"(\w)[-–]\s+(\w)", r"\1\2", text)
+    text = re.sub(r"\nPage \d+\n|\n\d+\n", "", text)
+    text = re.sub(r"\n+", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    text = re.sub(r"\d+\.", "", text)
+    return text
+
+
+def load_app(app_path):
+    app_path = os.path.abspath(app_path)
+    spec = importlib.util.spec_from_file_location("facts_app", app_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, os.path.dirname(app_path))
+    spec.loader.exec_module(module)
+    return module
+
+
+def best_time(func, text, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def first_difference(a, b):
+    for i, (ca, cb) in enumerate(zip(a, b)):
+        if ca != cb:
+            return i
+    return min(len(a), len(b))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf_folder")
+    parser.add_argument("--app", default="app.py", help="path to app.py or app[GER].py")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = load_app(args.app)
+    legacy = legacy_clean_text_de if "GER" in os.path.basename(args.app) else legacy_clean_text_en
+
+    pdf_files = sorted(
+        os.path.join(args.pdf_folder, name)
+        for name in os.listdir(args.pdf_folder)
+        if name.lower().endswith(".pdf")
+    )
+    if not pdf_files:
+        print(f"No PDFs found in {args.pdf_folder}")
+        return 1
+
+    total_legacy = total_new = 0.0
+    total_chars = 0
+    mismatches = 0
+    print(f"{'file':40} {'chars':>10} {'legacy ms':>10} {'new ms':>10} {'speedup':>8}  equal")
+    for pdf_path in pdf_files:
+        raw, _ = app.extract_text_from_pdf(pdf_path)
+        t_legacy, expected = best_time(legacy, raw, args.repeat)
+        t_new, actual = best_time(app.clean_text, raw, args.repeat)
+        equal = expected == actual
+
+        total_legacy += t_legacy
+        total_new += t_new
+        total_chars += len(raw)
+        name = os.path.basename(pdf_path)[:40]
+        speedup = t_legacy / t_new if t_new else float("inf")
+        print(f"{name:40} {len(raw):>10} {t_legacy * 1000:>10.2f} {t_new * 1000:>10.2f} {speedup:>7.2f}x  {equal}")
+
+        if not equal:
+            mismatches += 1
+            pos = first_difference(expected, actual)
+            print(f"    first difference at {pos}:")
+            print(f"    legacy: {expected[max(0, pos - 40):pos + 40]!r}")
+            print(f"    new:    {actual[max(0, pos - 40):pos + 40]!r}")
+
+    speedup = total_legacy / total_new if total_new else float("inf")
+    print()
+    print(f"{len(pdf_files)} PDFs, {total_chars} characters")
+    print(f"legacy {total_legacy * 1000:.1f} ms, new {total_new * 1000:.1f} ms ({speedup:.2f}x)")
+    print(f"{mismatches} mismatching outputs")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Compares the line-oriented result parser of a FACTS app against regex parsers
+on analysis result files and reports timings and any output mismatches.
+
+Usage:
+    python benchmarks/result_parser_benchmark.py [RESULT_FOLDER] [--app app.py] [--size-mb 8] [--repeat 3]
+
+Without RESULT_FOLDER a synthetic result file of --size-mb megabytes is
+generated. The app's output is checked against a header-aware regex that
+splits at section headers and groups answers by question number. The former
+nested-quantifier regex is timed as well; it keeps only the first answer of
+each section and keys it by section index, so its answer count differs.
+"""
+import argparse
+import importlib.util
+import os
+import random
+import re
+import sys
+import time
+
+
+def legacy_parse(texts, header):
+    pattern_section = header + r" \d+:\s*((?:(?:\d+\.\s*.*?(?=\n\d+\.|\Z)))+)"
+    all_sections = {}
+    for text in texts:
+        sections = re.findall(pattern_section, text, re.DOTALL)
+        for idx, sec in enumerate(sections, start=1):
+            answers = re.findall(r"\d+\.\s*(.*?)(?=\n\d+\.|\Z)", sec, re.DOTALL)
+            answers = [ans.strip() for ans in answers]
+            if answers:
+                all_sections.setdefault(idx, []).extend(answers)
+    return all_sections
+
+
+def header_regex_parse(texts, header):
+    section_re = re.compile(
+        r"^" + header + r" \d+:[^\n]*\n?(.*?)(?=^" + header + r" \d+:|\Z)", re.M | re.S
+    )
+    answer_re = re.compile(r"^(\d+)\.\s*(.*?)(?=^\d+\.|\Z)", re.M | re.S)
+    all_sections = {}
+    for text in texts:
+        for sec in section_re.findall(text):
+            for number, answer in answer_re.findall(sec):
+                all_sections.setdefault(int(number), []).append(answer.strip())
+    return all_sections
+
+
+def synthetic_result(size_mb, header, answer_label, citation_label, seed=42):
+    rnd = random.Random(seed)
+    words = (
+        "teachers students learning school classroom feedback assessment "
+        "motivation curriculum digital media reading inclusion parents"
+    ).split()
+    parts = []
+    size = 0
+    section = 0
+    while size < size_mb * 1024 * 1024:
+        section += 1
+        lines = [f"\n\n{header} {section}:"]
+        for n in range(1, 4):
+            if rnd.random() < 0.5:
+                lines.append(f"{n}. NO ANSWER!")
+            else:
+                answer = " ".join(rnd.choices(words, k=rnd.randint(5, 30)))
+                citation = " ".join(rnd.choices(words, k=rnd.randint(5, 20)))
+                lines.append(f"{n}. {answer_label}: {answer}\n   {citation_label}: {citation}")
+        block = "\n".join(lines) + "\n"
+        parts.append(block)
+        size += len(block)
+    return "".join(parts)
+
+
+def load_app(app_path):
+    app_path = os.path.abspath(app_path)
+    spec = importlib.util.spec_from_file_location("facts_app", app_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, os.path.dirname(app_path))
+    spec.loader.exec_module(module)
+    return module
+
+
+def best_time(func, texts, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(texts)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("result_folder", nargs="?")
+    parser.add_argument("--app", default="app.py", help="path to app.py or app[GER].py")
+    parser.add_argument("--size-mb", type=float, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = load_app(args.app)
+    if "GER" in os.path.basename(args.app):
+        header, answer_label, citation_label = "Ergebnis für Abschnitt", "Antwort", "Beleg"
+    else:
+        header, answer_label, citation_label = "Result for section", "Answer", "Citation"
+
+    if args.result_folder:
+        texts = list(app.iter_text_files(args.result_folder))
+        if not texts:
+            print(f"No result files found in {args.result_folder}")
+            return 1
+    else:
+        texts = [synthetic_result(args.size_mb, header, answer_label, citation_label)]
+    total_chars = sum(len(text) for text in texts)
+
+    t_legacy, legacy = best_time(lambda t: legacy_parse(t, header), texts, args.repeat)
+    t_regex, expected = best_time(lambda t: header_regex_parse(t, header), texts, args.repeat)
+    t_new, actual = best_time(app.categorize_responses_by_question, texts, args.repeat)
+
+    def count(result):
+        return sum(len(answers) for answers in result.values())
+
+    print(f"{len(texts)} files, {total_chars} characters")
+    print(f"{'parser':24} {'ms':>10} {'answers':>10}")
+    print(f"{'legacy regex':24} {t_legacy * 1000:>10.1f} {count(legacy):>10}")
+    print(f"{'header-aware regex':24} {t_regex * 1000:>10.1f} {count(expected):>10}")
+    print(f"{'line parser (app)':24} {t_new * 1000:>10.1f} {count(actual):>10}")
+
+    mismatches = 0
+    for question_id in sorted(set(expected) | set(actual)):
+        if expected.get(question_id) != actual.get(question_id):
+            mismatches += 1
+            print(f"    question {question_id}: answers differ")
+    print(f"{mismatches} mismatching questions")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())